@@ -0,0 +1,311 @@
+"""
+Vectorized aggregations over trailing rolling windows.
+
+Each ``rolling_*`` function takes an array ``x`` and window width ``wlen``
+and returns an array of the same shape where element ``i`` is the
+nan-safe aggregate of ``x[max(0, i - wlen + 1):i + 1]``, i.e. the first
+``wlen - 1`` windows are partial. For 2D ``x``, this is done for every
+column in a single call. This matches what
+:func:`orangecontrib.timeseries.moving_transform` computes by applying the
+aggregation function to each window separately, but in O(N) instead of
+O(N * wlen).
+
+When bottleneck is available, its ``move_*`` functions compute sums, means
+and extremes. Variances and standard deviations always come from
+:func:`rolling_moments`: bottleneck's running sums are never restarted and
+lose precision on long series with large values.
+
+Aggregations without such an algorithm can still avoid the per-window
+Python loop with :func:`rolling_apply`, which passes them strided views
+of many windows at once.
+
+Functions ``reduceat_*`` aggregate consecutive groups of values, given
+by indices at which the groups start, in a single pass (see
+:obj:`numpy.ufunc.reduceat`).
+"""
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from scipy.ndimage import minimum_filter1d, maximum_filter1d
+
+try:
+    import bottleneck
+except ImportError:  # Comes with Orange, but is not required here
+    bottleneck = None
+
+#: Number of window elements processed by a single call in `rolling_apply`;
+#: keeps any temporary copies made by the reduction small enough for cache
+_CHUNK_SIZE = 2 ** 15
+#: Number of rows over which `rolling_moments` accumulates running sums
+_MOMENTS_BLOCK = 2 ** 10
+
+
+def _sliding_windows(x, wlen):
+    """
+    Return a read-only view of all full windows of 1D `x` in rows, like
+    `numpy.lib.stride_tricks.sliding_window_view` (numpy >= 1.20)
+    """
+    stride, = x.strides
+    return as_strided(x, shape=(len(x) - wlen + 1, wlen),
+                      strides=(stride, stride), writeable=False)
+
+
+def _window_sum(x, wlen):
+    """Sums of trailing windows, obtained as differences of a running sum"""
+    csum = np.cumsum(x, axis=0, dtype=float)
+    out = csum.copy()
+    out[wlen:] -= csum[:-wlen]
+    return out
+
+
+def _count_dtype(n):
+    """The narrowest integer type that can hold counts up to `n`"""
+    return np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+
+def _window_count(valid, wlen):
+    """Number of defined values in each trailing window"""
+    csum = np.cumsum(valid, axis=0, dtype=_count_dtype(len(valid)))
+    out = csum.copy()
+    out[wlen:] -= csum[:-wlen]
+    return out
+
+
+Moments = NamedTuple("Moments", [("sum", np.ndarray), ("sum2", np.ndarray),
+                                  ("count", np.ndarray), ("shift", np.ndarray)])
+
+
+def rolling_moments(x, wlen):
+    """
+    Return sums, sums of squares and counts of defined values in trailing
+    windows, from which `moments_*` functions derive sum, mean, variance and
+    standard deviation without another pass through the data.
+
+    Running sums are restarted for each block of `_MOMENTS_BLOCK` rows, so
+    rounding errors don't accumulate along the column, and values in each
+    block are shifted by `shift` (mean of the block) to reduce cancellation
+    in computing variance as s2/n - mean².
+    """
+    x = np.asarray(x, dtype=float)
+    isnan = np.isnan(x)
+    sums, sums2 = np.empty(x.shape), np.empty(x.shape)
+    counts = np.empty(x.shape, dtype=_count_dtype(len(x)))
+    shift = np.empty(x.shape)
+    block = max(_MOMENTS_BLOCK, 4 * wlen)
+    for start in range(0, len(x), block):
+        stop = min(start + block, len(x))
+        # Include the values preceding the block that fall into its windows
+        first = max(0, start - wlen + 1)
+        part, part_nan = x[first:stop], isnan[first:stop]
+        defined = (~part_nan).sum(axis=0)
+        part_shift = np.nansum(part, axis=0) / np.maximum(defined, 1)
+        part = part - part_shift
+        part[part_nan] = 0
+        skip = start - first
+        sums[start:stop] = _window_sum(part, wlen)[skip:]
+        sums2[start:stop] = _window_sum(part ** 2, wlen)[skip:]
+        counts[start:stop] = _window_count(~part_nan, wlen)[skip:]
+        shift[start:stop] = part_shift
+    return Moments(sums, sums2, counts, shift)
+
+
+def moments_sum(moments):
+    return moments.sum + moments.count * moments.shift
+
+
+def moments_mean(moments):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return moments.sum / moments.count + moments.shift
+
+
+def moments_var(moments):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = moments.sum / moments.count
+        var = moments.sum2 / moments.count - mean ** 2
+    # Rounding may produce tiny negative variances of constant windows
+    return np.maximum(var, 0)
+
+
+def moments_std(moments):
+    return np.sqrt(moments_var(moments))
+
+
+def _move(name, x, wlen):
+    """
+    Return the result of bottleneck's `move_<name>` with partial windows,
+    or None if bottleneck is not available
+    """
+    if bottleneck is None or not len(x):
+        return None
+    # Bottleneck doesn't allow windows longer than the data; these are
+    # partial anyway
+    return getattr(bottleneck, 'move_' + name)(
+        x, min(wlen, len(x)), min_count=1, axis=0)
+
+
+def rolling_sum(x, wlen):
+    x = np.asarray(x, dtype=float)
+    # Sum of a window without defined values is 0, as with nansum
+    out = _move('sum', np.where(np.isnan(x), 0, x), wlen)
+    if out is None:
+        out = moments_sum(rolling_moments(x, wlen))
+    return out
+
+
+def rolling_mean(x, wlen):
+    x = np.asarray(x, dtype=float)
+    out = _move('mean', x, wlen)
+    if out is None:
+        out = moments_mean(rolling_moments(x, wlen))
+    return out
+
+
+def rolling_var(x, wlen):
+    return moments_var(rolling_moments(x, wlen))
+
+
+def rolling_std(x, wlen):
+    return moments_std(rolling_moments(x, wlen))
+
+
+def _rolling_extreme(x, wlen, name, filter1d, fill):
+    x = np.asarray(x, dtype=float)
+    out = _move(name, x, wlen)
+    if out is not None:
+        return out
+    isnan = np.isnan(x)
+    # Filters use the ascending-minima (monotonic deque) algorithm.
+    # The maximal origin aligns the windows to end at the current element.
+    out = filter1d(np.where(isnan, fill, x), wlen, axis=0,
+                   mode='constant', cval=fill, origin=(wlen - 1) // 2)
+    out[_window_count(~isnan, wlen) == 0] = np.nan
+    return out
+
+
+def rolling_min(x, wlen):
+    return _rolling_extreme(x, wlen, 'min', minimum_filter1d, np.inf)
+
+
+def rolling_max(x, wlen):
+    return _rolling_extreme(x, wlen, 'max', maximum_filter1d, -np.inf)
+
+
+def windowed_mode(windows):
+    """
+    Return the most common defined value in each row, or the smallest such
+    value in case of ties (like `scipy.stats.mode`).
+    """
+    windows = np.sort(windows, axis=1)  # nans go last
+    positions = np.arange(windows.shape[1])
+    run_start = np.ones(windows.shape, dtype=bool)
+    run_start[:, 1:] = windows[:, 1:] != windows[:, :-1]
+    # Length of run of equal values up to (and including) each element
+    lengths = positions - np.maximum.accumulate(
+        np.where(run_start, positions, 0), axis=1) + 1
+    lengths[np.isnan(windows)] = 0
+    best = lengths.argmax(axis=1)
+    out = windows[np.arange(len(windows)), best]
+    out[lengths.max(axis=1) == 0] = np.nan
+    return out
+
+
+def rolling_mode(x, wlen):
+    """
+    Rolling mode. For columns with few distinct values, keep a histogram
+    of values as the window slides; otherwise sort the windows.
+    """
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 2:
+        return np.column_stack([rolling_mode(col, wlen) for col in x.T])
+
+    isnan = np.isnan(x)
+    values, codes = np.unique(x[~isnan], return_inverse=True)
+    n_values = len(values)
+    if not n_values:
+        return np.full(len(x), np.nan)
+    # Each chunk of rows also recounts the `wlen - 1` rows preceding it, so
+    # the histogram only pays off when it stays small
+    chunk = max(1, _CHUNK_SIZE // n_values)
+    if n_values > wlen or n_values * (chunk + wlen) > 4 * _CHUNK_SIZE:
+        return rolling_apply(x, wlen, windowed_mode)
+
+    all_codes = np.full(len(x), n_values)  # nans fall out of histogram
+    all_codes[~isnan] = codes
+    out = np.full(len(x), np.nan)
+    for start in range(0, len(x), chunk):
+        stop = min(start + chunk, len(x))
+        # Include the values preceding the chunk that fall into its windows
+        first = max(0, start - wlen + 1)
+        onehot = all_codes[first:stop, None] == np.arange(n_values)
+        counts = _window_count(onehot, wlen)[start - first:]
+        best = counts.argmax(axis=1)
+        defined = counts[np.arange(len(best)), best] > 0
+        out[start:stop][defined] = values[best[defined]]
+    return out
+
+
+def rolling_apply(x, wlen, func, step=1, out=None):
+    """
+    Apply `func` to trailing windows of `x` that end `step` elements apart.
+
+    The last window ends at the last element of `x`. `func` receives a 2D
+    array with windows in rows, ordered from the latest to the earliest
+    value (as `moving_transform` reverses them), and must reduce it along
+    axis 1. Partial windows at the beginning are passed one at a time.
+    Results are written into `out`, if given.
+    """
+    x = np.asarray(x, dtype=float)
+    ends = np.arange(len(x) - 1, -1, -step)[::-1]
+    n_partial = np.searchsorted(ends, wlen - 1)
+    if out is None:
+        out = np.empty(len(ends))
+    for i, end in enumerate(ends[:n_partial]):
+        out[i] = func(x[end::-1][None, :])[0]
+    if n_partial < len(ends):
+        start = ends[n_partial] - wlen + 1
+        windows = _sliding_windows(x, wlen)[start::step, ::-1]
+        chunk = max(1, _CHUNK_SIZE // wlen)
+        for i in range(0, len(windows), chunk):
+            out[n_partial + i:n_partial + i + chunk] = func(windows[i:i + chunk])
+    return out
+
+
+def reduceat_sum(x, starts):
+    x = np.asarray(x, dtype=float)
+    return np.add.reduceat(np.where(np.isnan(x), 0, x), starts)
+
+
+def reduceat_count_defined(x, starts):
+    return np.add.reduceat(~np.isnan(np.asarray(x, dtype=float)), starts,
+                           dtype=np.int64)
+
+
+def reduceat_mean(x, starts):
+    with np.errstate(invalid='ignore'):
+        return reduceat_sum(x, starts) / reduceat_count_defined(x, starts)
+
+
+def _reduceat_extreme(x, starts, ufunc, fill):
+    x = np.asarray(x, dtype=float)
+    out = ufunc.reduceat(np.where(np.isnan(x), fill, x), starts)
+    out[reduceat_count_defined(x, starts) == 0] = np.nan
+    return out
+
+
+def reduceat_max(x, starts):
+    return _reduceat_extreme(x, starts, np.maximum, -np.inf)
+
+
+def reduceat_min(x, starts):
+    return _reduceat_extreme(x, starts, np.minimum, np.inf)
+
+
+def reduceat_prod(x, starts):
+    x = np.asarray(x, dtype=float)
+    return np.multiply.reduceat(np.where(np.isnan(x), 1, x), starts)
+
+
+def reduceat_count_nonzero(x, starts):
+    x = np.asarray(x, dtype=float)
+    return np.add.reduceat(~np.isnan(x) & (x != 0), starts, dtype=np.int64)
@@ -3,6 +3,8 @@ from typing import NamedTuple, Union, Callable
 import numpy as np
 from scipy.stats import mode, hmean, gmean
 
+from orangecontrib.timeseries import _windows
+
 
 class _AggFuncMeta(type):
     def __call__(cls, array):
@@ -20,50 +22,89 @@ class _AggFunc(metaclass=_AggFuncMeta):
     """
     #: Override this
     __func__ = None
+    #: Optionally override this with a function (array, window_length) that
+    #: computes the aggregation over all trailing windows at once.
+    #: See :mod:`orangecontrib.timeseries._windows`.
+    __rolling__ = None
+    #: Optionally override this with a function that computes the rolling
+    #: aggregation from `_windows.Moments`, which can be shared by
+    #: several aggregations of the same windows.
+    __moments__ = None
+    #: Optionally override this with a function that computes the aggregation
+    #: of each row of a 2D array. See `_windows.rolling_apply`.
+    __windowed__ = None
+    #: Optionally override this with a function (array, starts) that
+    #: aggregates consecutive groups starting at indices `starts`.
+    __reduceat__ = None
 
 
 class Sum(_AggFunc):
     __func__ = np.nansum
+    __rolling__ = _windows.rolling_sum
+    __moments__ = _windows.moments_sum
+    __reduceat__ = _windows.reduceat_sum
 
 
 class Product(_AggFunc):
     __func__ = np.nanprod
+    __windowed__ = lambda windows: np.nanprod(windows, axis=1)
+    __reduceat__ = _windows.reduceat_prod
 
 
 class Mean(_AggFunc):
     __func__ = np.nanmean
+    __rolling__ = _windows.rolling_mean
+    __moments__ = _windows.moments_mean
+    __reduceat__ = _windows.reduceat_mean
 
 
 class Count_nonzero(_AggFunc):
     __func__ = lambda arr: np.count_nonzero(arr[~np.isnan(arr)])
+    __windowed__ = lambda windows: np.count_nonzero(
+        ~np.isnan(windows) & (windows != 0), axis=1)
+    __reduceat__ = _windows.reduceat_count_nonzero
 
 
 class Count_defined(_AggFunc):
     __func__ = lambda arr: (~np.isnan(arr)).sum()
+    __windowed__ = lambda windows: (~np.isnan(windows)).sum(axis=1)
+    __reduceat__ = _windows.reduceat_count_defined
 
 
 class Max(_AggFunc):
     __func__ = np.nanmax
+    __rolling__ = _windows.rolling_max
+    __reduceat__ = _windows.reduceat_max
 
 
 class Min(_AggFunc):
     __func__ = np.nanmin
+    __rolling__ = _windows.rolling_min
+    __reduceat__ = _windows.reduceat_min
 
 
 class Median(_AggFunc):
     __func__ = np.nanmedian
+    __windowed__ = lambda windows: np.nanmedian(windows, axis=1)
 
 
 class Std_deviation(_AggFunc):
     __func__ = np.nanstd
+    __rolling__ = _windows.rolling_std
+    __moments__ = _windows.moments_std
 
 
 class Variance(_AggFunc):
     __func__ = np.nanvar
+    __rolling__ = _windows.rolling_var
+    __moments__ = _windows.moments_var
 
 
 class Mode(_AggFunc):
-    __func__ = lambda arr: mode(arr, nan_policy='omit').mode[0]
+    # Newer scipy returns a scalar mode for 1D input
+    __func__ = lambda arr: np.ravel(mode(arr, nan_policy='omit').mode)[0]
+    __rolling__ = _windows.rolling_mode
+    __windowed__ = _windows.windowed_mode
 
 
 class Cumulative_sum(_AggFunc):
@@ -80,26 +121,44 @@ class Cumulative_product(_AggFunc):
 class Harmonic_mean(_AggFunc):
     __func__ = lambda arr: hmean(arr[arr > 0], axis=None)
 
+    def __windowed__(windows):
+        positive = windows > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return positive.sum(axis=1) / \
+                   np.where(positive, 1 / windows, 0).sum(axis=1)
+
 
 class Geometric_mean(_AggFunc):
     __func__ = lambda arr: gmean(arr[np.logical_and(~np.isnan(arr), (arr != 0))], axis=None)
 
+    def __windowed__(windows):
+        valid = ~np.isnan(windows) & (windows != 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.exp(np.where(valid, np.log(windows), 0).sum(axis=1) /
+                          valid.sum(axis=1))
+
 
 class Weighted_MA(_AggFunc):
-    def __func__(arr):
-        l = len(arr)
-        w = np.arange(l, 0, -1) / (l * (l + 1) / 2)
-        return (w * arr).sum()
+    def _weights(l):
+        return np.arange(l, 0, -1) / (l * (l + 1) / 2)
+
+    __func__ = lambda arr: (Weighted_MA._weights(len(arr)) * arr).sum()
+    __windowed__ = lambda windows: \
+        windows @ Weighted_MA._weights(windows.shape[1])
 
 
 class Exponential_MA(_AggFunc):
-    def __func__(arr):
+    def _weights(l):
         # Window length is fixed (len(arr)) and the last element is considered
         # to add 1% to the total value. When this is inverted ...
-        alpha = 1 - np.exp(np.log(.01) / (len(arr) - 1))
-        w = (1 - alpha)**np.arange(len(arr))
+        alpha = 1 - np.exp(np.log(.01) / (l - 1))
+        w = (1 - alpha)**np.arange(l)
         w /= w.sum()
-        return (w * arr).sum()
+        return w
+
+    __func__ = lambda arr: (Exponential_MA._weights(len(arr)) * arr).sum()
+    __windowed__ = lambda windows: \
+        windows @ Exponential_MA._weights(windows.shape[1])
 
 
 class Concatenate(_AggFunc):
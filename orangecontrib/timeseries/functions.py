@@ -505,31 +505,90 @@ def moving_transform(data, spec, fixed_wlen=0):
         A table of original data its transformations.
     """
     from itertools import chain
+    from collections import defaultdict
     from Orange.data import ContinuousVariable, Domain
     from orangecontrib.timeseries import Timeseries
     from orangecontrib.timeseries.widgets.utils import available_name
-    from orangecontrib.timeseries.agg_funcs import Cumulative_sum, Cumulative_product
+    from orangecontrib.timeseries.agg_funcs import \
+        Cumulative_sum, Cumulative_product, Mean, Sum
+    from orangecontrib.timeseries._windows import \
+        Moments, bottleneck, rolling_apply, rolling_moments
 
-    X = []
-    attrs = []
-
-    for var, wlen, func in spec:
-        col = np.ravel(data[:, var])
-
-        if fixed_wlen:
-            wlen = fixed_wlen
+    if fixed_wlen:
+        spec = [(var, fixed_wlen, func) for var, _, func in spec]
+
+    # Spec usually holds several transformations of the same variable.
+    # Columns of X are strided views; copy them once so that the window
+    # functions stream over contiguous memory
+    columns = {var: np.ascontiguousarray(data.get_column_view(var)[0],
+                                         dtype=float)
+               for var, *_ in spec}
+    # Running sums don't survive infinities, hence the extra check
+    finite = {var for var, col in columns.items() if not np.isinf(col).any()}
+
+    # Rolling aggregations are computed for all variables with the same
+    # window width in one call; those derived from moments share the sums.
+    # Bottleneck's moving sums and means are faster still, but variances
+    # need the restarted sums of rolling_moments to stay precise
+    moment_batches = defaultdict(list)
+    rolling_batches = defaultdict(list)
+    for i, (var, wlen, func) in enumerate(spec):
+        if var not in finite:
+            continue
+        if getattr(func, '__moments__', None) and (
+                bottleneck is None or func not in (Sum, Mean)):
+            moment_batches[wlen].append(i)
+        elif getattr(func, '__rolling__', None):
+            rolling_batches[wlen, func].append(i)
+
+    # Fill the output table in place instead of stacking columns
+    n_rows = len(data)
+    if fixed_wlen:
+        n_rows = len(range(0, n_rows, fixed_wlen))
+    n_attrs = len(data.domain.attributes)
+    X = np.empty((n_rows, n_attrs + len(spec)))
+    out = X[:, n_attrs:]
+
+    def subsample(result):
+        return result[::-1][::fixed_wlen][::-1] if fixed_wlen else result
+
+    computed = set()
+    for wlen, indices in moment_batches.items():
+        variables = {var: j for j, var in
+                     enumerate(dict.fromkeys(spec[i][0] for i in indices))}
+        moments = rolling_moments(
+            np.column_stack([columns[var] for var in variables]), wlen)
+        for i in indices:
+            var, _, func = spec[i]
+            j = variables[var]
+            out[:, i] = subsample(func.__moments__(Moments(moments.sum[:, j],
+                                                           moments.sum2[:, j],
+                                                           moments.count[:, j],
+                                                           moments.shift[:, j])))
+        computed.update(indices)
+    for (wlen, func), indices in rolling_batches.items():
+        out[:, indices] = subsample(func.__rolling__(
+            np.column_stack([columns[spec[i][0]] for i in indices]), wlen))
+        computed.update(indices)
 
-        if func in (Cumulative_sum, Cumulative_product):
-            out = list(chain.from_iterable(func(col[i:i + wlen])
-                                           for i in range(0, len(col), wlen)))
+    attrs = []
+    for k, (var, wlen, func) in enumerate(spec):
+        col = columns[var]
+        windowed = getattr(func, '__windowed__', None)
+
+        if k in computed:
+            pass  # Already computed in a batch above
+        elif func in (Cumulative_sum, Cumulative_product):
+            out[:, k] = list(chain.from_iterable(
+                func(col[i:i + wlen]) for i in range(0, len(col), wlen)))
+        elif windowed is not None:
+            rolling_apply(col, wlen, windowed, wlen if fixed_wlen else 1,
+                          out=out[:, k])
         else:
             # In reverse cause lazy brain. Also prefer informative ends, not beginnings as much
             col = col[::-1]
-            out = [func(col[i:i + wlen])
-                   for i in range(0, len(col), wlen if bool(fixed_wlen) else 1)]
-            out = out[::-1]
-
-        X.append(out)
+            out[:, k] = [func(col[i:i + wlen])
+                         for i in range(0, len(col), wlen if bool(fixed_wlen) else 1)][::-1]
 
         template = '{} ({}; {})'.format(var.name, wlen, func.__name__.lower().replace('_', ' '))
         name = available_name(data.domain, template)
@@ -537,17 +596,15 @@ def moving_transform(data, spec, fixed_wlen=0):
 
     dataX, dataY, dataM = data.X, data.Y, data.metas
     if fixed_wlen:
-        n = len(X[0])
-        dataX = dataX[::-1][::fixed_wlen][:n][::-1]
-        dataY = dataY[::-1][::fixed_wlen][:n][::-1]
-        dataM = dataM[::-1][::fixed_wlen][:n][::-1]
+        dataX = dataX[::-1][::fixed_wlen][:n_rows][::-1]
+        dataY = dataY[::-1][::fixed_wlen][:n_rows][::-1]
+        dataM = dataM[::-1][::fixed_wlen][:n_rows][::-1]
+    X[:, :n_attrs] = dataX
 
     ts = Timeseries.from_numpy(Domain(data.domain.attributes + tuple(attrs),
                                       data.domain.class_vars,
                                       data.domain.metas),
-                               np.column_stack(
-                                   (dataX, np.column_stack(X))) if X else dataX,
-                               dataY, dataM)
+                               X, dataY, dataM)
     ts.time_variable = data.time_variable
     return ts
 
@@ -0,0 +1,24 @@
+import unittest
+import numpy as np
+
+from orangecontrib.timeseries.agg_funcs import AGG_FUNCTIONS
+
+
+class TestReduceat(unittest.TestCase):
+    def test_reduceat(self):
+        x = np.random.RandomState(0).normal(10, 3, 30)
+        x[[3, 4, 5, 6, 20, 29]] = np.nan
+        x[[12, 14, 15]] = 0
+        # A group of nans only, and a single-element group
+        starts = np.array([0, 3, 7, 12, 13, 20, 25])
+        for func in AGG_FUNCTIONS:
+            if func.__reduceat__ is None:
+                continue
+            with np.errstate(all='ignore'):
+                expected = [func(group) for group in np.split(x, starts[1:])]
+            np.testing.assert_allclose(func.__reduceat__(x, starts), expected,
+                                       err_msg=str(func))
+
+
+if __name__ == '__main__':
+    unittest.main()
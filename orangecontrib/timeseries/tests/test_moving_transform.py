@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from Orange.data import Domain, ContinuousVariable
+
+from orangecontrib.timeseries import Timeseries, moving_transform
+from orangecontrib.timeseries.agg_funcs import \
+    Mean, Sum, Max, Min, Std_deviation, Variance, Median, Product, \
+    Count_nonzero, Count_defined, Weighted_MA, Exponential_MA, \
+    Harmonic_mean, Geometric_mean, Mode
+from orangecontrib.timeseries._windows import _MOMENTS_BLOCK
+
+
+def windows(col, wlen, fixed_wlen=False):
+    """Trailing windows, the way moving_transform sees them"""
+    col = col[::-1]
+    step = wlen if fixed_wlen else 1
+    return [col[i:i + wlen] for i in range(0, len(col), step)][::-1]
+
+
+class TestMovingTransform(unittest.TestCase):
+    def setUp(self):
+        x = np.random.RandomState(0).normal(10, 3, 50)
+        x[[3, 4, 5, 6, 7, 20, 49]] = np.nan
+        x[[12, 30]] = 0
+        self.set_column(x)
+
+    def set_column(self, x):
+        self.data = Timeseries.from_numpy(
+            Domain([ContinuousVariable('x')]), x[:, None])
+        self.col = x
+
+    def assert_transform(self, funcs, fixed_wlen=0):
+        var = self.data.domain['x']
+        for wlen in (1, 3, 5, 60):
+            spec = [(var, wlen, func) for func in funcs]
+            transformed = moving_transform(self.data, spec, fixed_wlen)
+            wlen = fixed_wlen or wlen
+            for i, func in enumerate(funcs, start=1):
+                with np.errstate(invalid='ignore'):
+                    expected = [func(w) for w in
+                                windows(self.col, wlen, bool(fixed_wlen))]
+                np.testing.assert_allclose(
+                    transformed.X[:, i], expected, atol=1e-6,
+                    err_msg='{} ({})'.format(func, wlen))
+
+    def test_rolling(self):
+        funcs = (Mean, Sum, Max, Min, Std_deviation, Variance)
+        with np.errstate(all='ignore'):
+            self.assert_transform(funcs)
+            self.assert_transform(funcs, fixed_wlen=4)
+
+    @patch('orangecontrib.timeseries._windows.bottleneck', None)
+    def test_rolling_without_bottleneck(self):
+        self.test_rolling()
+        self.test_multiple_variables()
+
+    def test_windowed(self):
+        funcs = (Median, Product, Count_nonzero, Count_defined,
+                 Weighted_MA, Exponential_MA, Harmonic_mean, Geometric_mean)
+        with np.errstate(all='ignore'):
+            self.assert_transform(funcs)
+            self.assert_transform(funcs, fixed_wlen=4)
+
+    def test_rolling_precision(self):
+        # Running sums over a long trending series lose precision unless
+        # they are restarted along the column
+        x = np.cumsum(np.random.RandomState(0).normal(1, 1, 10 ** 6))
+        self.set_column(x)
+        var = self.data.domain['x']
+        transformed = moving_transform(
+            self.data,
+            [(var, 5, Mean), (var, 5, Variance), (var, 5, Std_deviation)])
+        windows = np.column_stack([x[i:len(x) - 4 + i] for i in range(5)])
+        np.testing.assert_allclose(transformed.X[4:, 1],
+                                   windows.mean(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(transformed.X[4:, 2],
+                                   windows.var(axis=1), rtol=1e-5)
+        np.testing.assert_allclose(transformed.X[4:, 3],
+                                   windows.std(axis=1), rtol=1e-5)
+        self.test_rolling_var_of_constant_run()
+
+    @patch('orangecontrib.timeseries._windows.bottleneck', None)
+    def test_rolling_precision_without_bottleneck(self):
+        self.test_rolling_precision()
+
+    def test_rolling_var_of_constant_run(self):
+        # Rounding errors of running sums over the noisy part must not
+        # leak into the constant part past the block with the noise
+        x = np.full(4000, 1e6)
+        x[:1000] += np.random.RandomState(0).normal(0, 100, 1000)
+        self.set_column(x)
+        var = self.data.domain['x']
+        transformed = moving_transform(
+            self.data, [(var, 5, Variance), (var, 5, Std_deviation)])
+        np.testing.assert_array_equal(transformed.X[_MOMENTS_BLOCK:, 1:], 0)
+
+    def test_mode(self):
+        with np.errstate(all='ignore'):
+            self.assert_transform((Mode, ))
+            self.assert_transform((Mode, ), fixed_wlen=4)
+            # Few distinct values
+            self.set_column(np.round(self.col / 5))
+            self.assert_transform((Mode, ))
+            # No defined values
+            self.set_column(np.full(len(self.col), np.nan))
+            self.assert_transform((Mode, ))
+            self.assert_transform((Mode, ), fixed_wlen=4)
+
+    def test_multiple_variables(self):
+        x = self.col
+        data = Timeseries.from_numpy(
+            Domain([ContinuousVariable(name) for name in 'abc']),
+            np.column_stack((x, x[::-1], x ** 2)))
+        a, b, c = data.domain.attributes
+        spec = [(a, 3, Mean), (b, 3, Std_deviation), (c, 5, Mean),
+                (a, 3, Max), (c, 3, Max), (b, 3, Mean), (c, 3, Sum)]
+        transformed = moving_transform(data, spec)
+        for i, (var, wlen, func) in enumerate(spec, start=3):
+            single = moving_transform(data, [(var, wlen, func)])
+            np.testing.assert_allclose(transformed.X[:, i], single.X[:, 3])
+
+    def test_infinities(self):
+        self.col[10] = np.inf
+        self.set_column(self.col)
+        self.assert_transform((Mean, Sum, Max, Min))
+
+
+if __name__ == '__main__':
+    unittest.main()
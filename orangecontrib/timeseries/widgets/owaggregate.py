@@ -1,4 +1,4 @@
-from itertools import chain, groupby
+from itertools import chain
 from collections import OrderedDict
 
 import numpy as np
@@ -44,10 +44,14 @@ class OWAggregate(widget.OWWidget):
         ('minute', lambda date: date.replace(second=0, microsecond=0)),
         ('hour', lambda date: date.replace(minute=0, second=0, microsecond=0)),
         ('day', lambda date: date.replace(hour=0, minute=0, second=0, microsecond=0)),
-        ('week', lambda date: date.strptime(date.strftime('%Y-W%W-0'), '%Y-W%W-%w')),  # Doesn't work for years before 1000
+        ('week', lambda date: date.strptime(date.strftime('%Y-W%W-0'), '%Y-W%W-%w')
+                              .replace(tzinfo=date.tzinfo)),  # Doesn't work for years before 1000
         ('month', lambda date: date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)),
         ('year', lambda date: date.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)),
     ))
+    #: Units of numpy datetime64 to which intervals (except weeks) truncate
+    AGG_TIME_UNITS = {'second': 's', 'minute': 'm', 'hour': 'h', 'day': 'D',
+                      'month': 'M', 'year': 'Y'}
 
     class Error(widget.OWWidget.Error):
         no_time_variable = widget.Msg(
@@ -55,6 +59,8 @@ class OWAggregate(widget.OWWidget):
 
     def __init__(self):
         self.data = None
+        # Grouping of rows into periods, kept until data or interval changes
+        self._period_cache = None
 
         gui.comboBox(self.controlArea, self, 'agg_interval',
                      label='Aggregate by:',
@@ -120,6 +126,7 @@ class OWAggregate(widget.OWWidget):
             self.Error.no_time_variable()
             data = None
         self.data = data
+        self._period_cache = None
         if data is None:
             self.model.clear()
             self.commit()
@@ -152,51 +159,87 @@ class OWAggregate(widget.OWWidget):
             self.Outputs.time_series.send(None)
             return
 
-        # Group-by expects data sorted
-        sorted_indices = np.argsort(data.time_values)
-        if not np.all(sorted_indices == np.arange(len(data))):
-            data = Timeseries.from_data_table(Table.from_table_rows(data, sorted_indices))
-
+        # Resolve the output part, column and aggregation of each variable
+        # once; the first column of X holds period start times
         attrs, cvars, metas = [], [], []
-        for attr, _ in self.model:
+        plan = []
+        for attr, func in self.model:
             if attr in data.domain.attributes:
                 attrs.append(attr)
+                part, col = 0, len(attrs)
             elif attr in data.domain.class_vars:
                 cvars.append(attr)
+                part, col = 1, len(cvars) - 1
             else:
                 metas.append(attr)
-
-        aggregate_time = self.AGG_TIME[self.agg_interval]
-
-        def time_key(i):
-            return timestamp(aggregate_time(fromtimestamp(data.time_values[i],
-                                                           tz=data.time_variable.timezone)))
-
-        times = []
-        X, Y, M = [], [], []
-        for key_time, indices in groupby(np.arange(len(data)), key=time_key):
-            times.append(key_time)
-            subset = data[list(indices)]
-
-            xs, ys, ms = [], [], []
-            for attr, func in self.model:
-                values = Table.from_table(Domain([], [], [attr], source=data.domain), subset).metas
-                out = (xs if attr in data.domain.attributes else
-                       ys if attr in data.domain.class_vars else
-                       ms)
-                out.append(func(values))
-
-            X.append(xs)
-            Y.append(ys)
-            M.append(ms)
+                part, col = 2, len(metas) - 1
+            plan.append((attr, attr.is_primitive(), func,
+                         getattr(func, '__reduceat__', None), part, col))
+
+        times, order, starts = self._periods()
+        n = len(times)
+        parts = (np.empty((n, len(attrs) + 1)),
+                 np.empty((n, len(cvars))),
+                 np.empty((n, len(metas)), dtype=object))
+        parts[0][:, 0] = times
+        for attr, primitive, func, reduceat, part, col in plan:
+            column = data.get_column_view(attr)[0]
+            if primitive:
+                column = column.astype(float)
+            sorted_col = column[order]
+
+            if reduceat is not None:
+                values = reduceat(sorted_col, starts)
+            else:
+                values = [func(group)
+                          for group in np.split(sorted_col, starts[1:])]
+            parts[part][:, col] = values
 
         ts = Timeseries.from_numpy(
-            Domain([data.time_variable] + attrs, cvars, metas),
-            np.column_stack((times, np.row_stack(X))),
-            np.array(Y),
-            np.array(np.row_stack(M), dtype=object))
+            Domain([data.time_variable] + attrs, cvars, metas), *parts)
         self.Outputs.time_series.send(ts)
 
+    def _periods(self):
+        """
+        Return period start times, the order of rows that puts rows of
+        each period together (in time order) and indices at which periods
+        start in this order. Changing aggregation functions reuses them.
+        """
+        if self._period_cache is None \
+                or self._period_cache[0] != self.agg_interval:
+            data = self.data
+            time_order = np.argsort(data.time_values, kind='stable')
+            keys = self._period_keys(data.time_values[time_order],
+                                     data.time_variable.timezone)
+            times, period_indices, counts = np.unique(
+                keys, return_inverse=True, return_counts=True)
+            order = time_order[np.argsort(period_indices, kind='stable')]
+            starts = np.concatenate(([0], np.cumsum(counts[:-1])))
+            self._period_cache = self.agg_interval, times, order, starts
+        return self._period_cache[1:]
+
+    def _period_keys(self, time_values, tz):
+        """Return the timestamp of the start of each value's period"""
+        offset = tz.utcoffset(None)
+        if offset is None or np.isnan(time_values).any():
+            # Timezones with daylight saving time need datetime
+            aggregate_time = self.AGG_TIME[self.agg_interval]
+            return np.array([timestamp(aggregate_time(fromtimestamp(t, tz=tz)))
+                             for t in time_values])
+
+        offset = offset.total_seconds()
+        local = np.floor(time_values + offset).astype(np.int64) \
+            .astype('datetime64[s]')
+        if self.agg_interval == 'week':
+            # Weeks start on Monday and, as with strptime('%W'), are keyed
+            # by their Sunday; 1970-01-01 was a Thursday
+            days = local.astype('datetime64[D]').astype(np.int64)
+            starts = (days - (days + 3) % 7 + 6).astype('datetime64[D]')
+        else:
+            starts = local.astype(
+                'datetime64[{}]'.format(self.AGG_TIME_UNITS[self.agg_interval]))
+        return starts.astype('datetime64[s]').astype(np.int64) - offset
+
 
 if __name__ == "__main__":
     from AnyQt.QtWidgets import QApplication
@@ -113,11 +113,10 @@ class OWDifference(widget.OWWidget):
     def _restore_selection(self):
         def restore(view, selection):
             with signal_blocking(view.selectionModel()):
-                # gymnastics for transforming variable names back to indices
-                var_list = [var for var in self.data.domain.variables
-                            if var.is_continuous and var is not
-                            self.data.time_variable]
-                indices = [var_list.index(i) for i in selection]
+                # transform variables back to indices; the model holds
+                # continuous variables other than the time variable
+                positions = {var: i for i, var in enumerate(self.model)}
+                indices = [positions[var] for var in selection]
                 select_rows(view, indices)
         restore(self.view, self.selected)
 
@@ -12,7 +12,7 @@ from AnyQt.QtWidgets import (
     QVBoxLayout,
 )
 from AnyQt.QtGui import QIcon, QCloseEvent
-from AnyQt.QtCore import QSize, pyqtSignal
+from AnyQt.QtCore import QSize, QItemSelection, pyqtSignal
 
 from orangewidget.utils.widgetpreview import WidgetPreview
 from Orange.data import TimeVariable, Table, Variable
@@ -24,7 +24,8 @@ from Orange.widgets.settings import (
     IncompatibleContext,
     DomainContextHandler,
 )
-from Orange.widgets.utils.itemmodels import VariableListModel
+from Orange.widgets.utils.itemmodels import VariableListModel, \
+    signal_blocking
 
 from orangecontrib.timeseries import Timeseries
 from orangecontrib.timeseries.widgets.highcharts import Highchart
@@ -131,12 +132,17 @@ class PlotConfigWidget(QWidget, gui.OWComponent):
             Variables to select
         """
         sel_model = self.view.selectionModel()
-        sel_model.clearSelection()
         model = self.view.model()
+        rows = {var: row for row, var in enumerate(model)}
+        selection = QItemSelection()
         for v in values:
-            index = model.indexOf(v)
-            index = model.index(index, 0)
-            sel_model.select(index, sel_model.Select)
+            index = model.index(rows[v], 0)
+            selection.select(index, index)
+        # Each selectionChanged redraws the plot, and an unchanged selection
+        # emits none; select silently and redraw exactly once
+        with signal_blocking(sel_model):
+            sel_model.select(selection, sel_model.ClearAndSelect)
+        self.selection_changed()
 
     def set_logarithmic(self, is_log: bool) -> None:
         """
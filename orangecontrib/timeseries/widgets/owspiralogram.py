@@ -1,7 +1,5 @@
 from enum import Enum
-from itertools import chain
 from numbers import Number
-from collections import defaultdict
 from os import path
 
 import numpy as np
@@ -89,36 +87,47 @@ class Spiralogram(Highchart):
         time_values = [fromtimestamp(i, tz=timeseries.time_variable.timezone)
                        for i in timeseries.time_values]
 
+        rows = [i for i, tval in enumerate(time_values) if tval is not None]
+        xkeys = [xfunc(i, time_values[i]) for i in rows]
+        ykeys = [yfunc(i, time_values[i]) for i in rows]
         if not yvals:
-            yvals = sorted(set(yfunc(i, v) for i, v in enumerate(time_values) if
-                               v is not None))
+            yvals = sorted(set(ykeys))
         if not xvals:
-            xvals = sorted(set(xfunc(i, v) for i, v in enumerate(time_values) if
-                               v is not None))
-
-        indices = defaultdict(list)
-        for i, tval in enumerate(time_values):
-            if tval is not None:
-                indices[(xfunc(i, tval), yfunc(i, tval))].append(i)
+            xvals = sorted(set(xkeys))
 
         if self._owwidget.invert_date_order:
             yvals = yvals[::-1]
 
+        # Group rows into cells by sorting them by cell index; rows of
+        # cell c are then cell_rows[offsets[c]:offsets[c + 1]]
+        xpos = {xval: j for j, xval in enumerate(xvals)}
+        ypos = {yval: j for j, yval in enumerate(yvals)}
+        cells = np.array([ypos[ykey] * len(xvals) + xpos[xkey]
+                          if xkey in xpos and ykey in ypos else -1
+                          for xkey, ykey in zip(xkeys, ykeys)], dtype=int)
+        rows = np.array(rows, dtype=int)[cells >= 0]
+        cells = cells[cells >= 0]
+        order = np.argsort(cells, kind='stable')
+        cell_rows = rows[order]
+        offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(cells, minlength=len(xvals) * len(yvals)))))
+
         series = []
         aggvals = []
         self.indices = []
         xname = self.AxesCategories.name_it(xdim)
         yname = self.AxesCategories.name_it(ydim)
-        for yval in yvals:
+        for yi, yval in enumerate(yvals):
             data = []
             series.append(dict(name=yname(yval), data=data))
             self.indices.append([])
-            for xval in xvals:
-                inds = indices.get((xval, yval), ())
+            for xi in range(len(xvals)):
+                cell = yi * len(xvals) + xi
+                inds = cell_rows[offsets[cell]:offsets[cell + 1]]
                 self.indices[-1].append(inds)
                 point = dict(y=1)
                 data.append(point)
-                if inds:
+                if len(inds):
                     try:
                         aggval = np.round(fagg(values[inds]), 4)
                     except ValueError:
@@ -167,12 +176,11 @@ class Spiralogram(Highchart):
                    ''')
 
     def selection_indices(self, indices):
-        result = []
-        for i, inds in enumerate(indices):
-            if len(inds):
-                for j in inds:
-                    result.append(self.indices[i][j])
-        return sorted(chain.from_iterable(result))
+        result = [self.indices[i][j]
+                  for i, inds in enumerate(indices) for j in inds]
+        if not result:
+            return []
+        return np.sort(np.concatenate(result)).tolist()
 
     OPTIONS = dict(
         chart=dict(
@@ -264,7 +272,12 @@ def _enum_str(enum_value, inverse=False):
     return enum_value.name.replace('_', ' ').lower()
 
 
-DEFAULT_AGG_FUNC = next(iter(AGG_OPTIONS.keys()))
+# Aggregations offered for each kind of variable, in the order of AGG_OPTIONS
+AGGS_ALL = tuple(AGG_OPTIONS)
+AGGS_DISCRETE = tuple(agg for agg, desc in AGG_OPTIONS.items() if desc.disc)
+AGGS_TIME = tuple(agg for agg, desc in AGG_OPTIONS.items() if desc.time)
+
+DEFAULT_AGG_FUNC = AGGS_ALL[0]
 
 
 class OWSpiralogram(widget.OWWidget):
@@ -391,17 +404,17 @@ class OWSpiralogram(widget.OWWidget):
 
     def update_agg_combo(self):
         self.combo_func.clear()
-        new_aggs = AGG_OPTIONS
+        new_aggs = AGGS_ALL
 
         if self.agg_attr is not None:
             if self.agg_attr.is_discrete:
-                new_aggs = [agg for agg in AGG_OPTIONS if AGG_OPTIONS[agg].disc]
+                new_aggs = AGGS_DISCRETE
             elif self.agg_attr.is_time:
-                new_aggs = [agg for agg in AGG_OPTIONS if AGG_OPTIONS[agg].time]
+                new_aggs = AGGS_TIME
         self.combo_func.addItems(new_aggs)
 
         if self.agg_func not in new_aggs:
-            self.agg_func = next(iter(new_aggs))
+            self.agg_func = new_aggs[0]
 
         self.replot()
 
@@ -439,7 +452,7 @@ class OWSpiralogram(widget.OWWidget):
             if type == 101: # discrete variable is always Mode in old settings
                 context.values["agg_func"] = ('Mode', pos)
             else:
-                context.values["agg_func"] = (list(AGG_OPTIONS)[ind], pos)
+                context.values["agg_func"] = (AGGS_ALL[ind], pos)
 
 
 if __name__ == "__main__":
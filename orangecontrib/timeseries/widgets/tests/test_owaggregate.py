@@ -1,13 +1,15 @@
 import unittest
+from datetime import timezone, timedelta
 
 import numpy as np
 
-from Orange.data import Domain, DiscreteVariable, Table
+from Orange.data import Domain, DiscreteVariable, Table, TimeVariable, \
+    ContinuousVariable, StringVariable
 from Orange.widgets.tests.base import WidgetTest
 
-from orangecontrib.timeseries import Timeseries
+from orangecontrib.timeseries import Timeseries, fromtimestamp, timestamp
 from orangecontrib.timeseries.widgets.owaggregate import OWAggregate
-from orangecontrib.timeseries.agg_funcs import AGG_FUNCTIONS
+from orangecontrib.timeseries.agg_funcs import AGG_FUNCTIONS, Concatenate
 
 
 class TestOWAggregate(WidgetTest):
@@ -64,6 +66,92 @@ class TestOWAggregate(WidgetTest):
         self.send_signal(self.widget.Inputs.time_series, self.time_series)
         self.assertEqual(self.widget.model[0][1], AGG_FUNCTIONS[1])
 
+    def test_change_interval(self):
+        w = self.widget
+        self.send_signal(w.Inputs.time_series, self.time_series)
+        w.controls.autocommit.click()
+        for interval, n in (('month', 144), ('year', 12), ('month', 144)):
+            w.agg_interval = interval
+            w.commit()
+            self.assertEqual(len(self.get_output(w.Outputs.time_series)), n)
+
+    def _daily_data(self):
+        """
+        Four rows per day for ten days, in shuffled order; return the table
+        and rows of each day in time order
+        """
+        rs = np.random.RandomState(0)
+        times = np.arange(40) * 6 * 3600.
+        values = rs.normal(5, 2, 40)
+        values[[3, 13, 14, 15]] = np.nan
+        values[5] = 0
+        names = np.array(['s{}'.format(i) for i in range(40)], dtype=object)
+        order = rs.permutation(40)
+        data = Timeseries.from_numpy(
+            Domain([TimeVariable('T', have_date=True, have_time=True),
+                    ContinuousVariable('x')],
+                   metas=[StringVariable('s')]),
+            np.column_stack((times, values))[order], metas=names[order, None])
+        return data, np.split(values, 10), np.split(names, 10)
+
+    def test_aggregation_functions(self):
+        w = self.widget
+        data, groups, _ = self._daily_data()
+        self.send_signal(w.Inputs.time_series, data)
+        w.controls.autocommit.click()
+        for func in AGG_FUNCTIONS:
+            w.model[0][1] = func
+            w.commit()
+            output = self.get_output(w.Outputs.time_series)
+            np.testing.assert_equal(output.X[:, 0], np.arange(10) * 86400.)
+            with np.errstate(all='ignore'):
+                expected = [func(group) for group in groups]
+            np.testing.assert_allclose(output.X[:, 1], expected,
+                                       err_msg=str(func))
+
+    def test_concatenate(self):
+        w = self.widget
+        data, _, names = self._daily_data()
+        self.send_signal(w.Inputs.time_series, data)
+        self.assertIs(w.model[1][1], Concatenate)
+        w.controls.autocommit.click()
+        output = self.get_output(w.Outputs.time_series)
+        self.assertEqual(list(output.metas[:, 0]),
+                         [' ; '.join(group) for group in names])
+        self.assertEqual(output.metas[0, 0], 's0 ; s1 ; s2 ; s3')
+
+    def test_continuous_metas(self):
+        """Continuous metas aggregated along with string metas stay numeric"""
+        w = self.widget
+        data, groups, _ = self._daily_data()
+        domain = data.domain
+        data = Timeseries.from_numpy(
+            Domain(domain.attributes,
+                   metas=domain.metas + (ContinuousVariable('m'), )),
+            data.X, metas=np.column_stack((data.metas, data.X[:, 1:])))
+        self.send_signal(w.Inputs.time_series, data)
+        w.controls.autocommit.click()
+        output = self.get_output(w.Outputs.time_series)
+        self.assertIsInstance(output.metas[1, 1], float)
+        with np.errstate(all='ignore'):
+            np.testing.assert_allclose(output.metas[:, 1].astype(float),
+                                       [np.nanmean(g) for g in groups])
+
+    def test_period_keys(self):
+        w = self.widget
+        rs = np.random.RandomState(0)
+        # Includes timestamps before 1970 and fractions of seconds
+        time_values = np.sort(np.concatenate((rs.uniform(-3e9, 3e9, 500),
+                                              rs.uniform(-1e6, 1e6, 500))))
+        for tz in (timezone.utc, timezone(timedelta(hours=2)),
+                   timezone(timedelta(hours=-5, minutes=-30))):
+            for interval, aggregate_time in w.AGG_TIME.items():
+                w.agg_interval = interval
+                expected = [timestamp(aggregate_time(fromtimestamp(t, tz=tz)))
+                            for t in time_values]
+                np.testing.assert_equal(w._period_keys(time_values, tz),
+                                        expected, err_msg=(tz, interval))
+
 
 if __name__ == "__main__":
     unittest.main()
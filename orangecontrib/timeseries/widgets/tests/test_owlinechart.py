@@ -105,6 +105,44 @@ class TestOWLineChart(WidgetTest):
         self.send_signal(w.Inputs.features, AttributeList(sel))
         self.assertEqual(2, len(w.configs))
 
+    def test_set_selection(self):
+        w = self.widget
+        self.send_signal(w.Inputs.time_series, self.amzn)
+        config = w.configs[0]
+        emitted = []
+        config.sigSelection.connect(lambda ax, sel: emitted.append(sel))
+
+        attrs = self.amzn.domain.attributes
+        sel = [attrs[4], attrs[1]]
+        config.set_selection(sel)
+        self.assertEqual(1, len(emitted))
+        self.assertSetEqual(set(sel), set(emitted[-1]))
+        self.assertListEqual(emitted[-1], config.get_selection())
+
+        # an unchanged selection still redraws, once
+        config.set_selection(sel)
+        self.assertEqual(2, len(emitted))
+        self.assertListEqual(emitted[0], emitted[1])
+
+        config.set_selection([])
+        self.assertEqual(3, len(emitted))
+        self.assertListEqual([], config.get_selection())
+
+    def test_features_reselect_updates_plot(self):
+        w = self.widget
+        self.send_signal(w.Inputs.time_series, self.amzn)
+        sel = self.amzn.domain.attributes[3:5]
+        self.send_signal(w.Inputs.features, AttributeList(sel))
+
+        emitted = []
+        for config in w.configs:
+            config.sigSelection.connect(
+                lambda ax, series: emitted.append((ax, series)))
+        self.send_signal(w.Inputs.features, AttributeList(sel))
+        self.assertListEqual(
+            [(w.configs[0].ax, [sel[0]]), (w.configs[1].ax, [sel[1]])],
+            emitted)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,13 @@
 import unittest
+from collections import defaultdict
+from itertools import chain
 
 from Orange.data import Table
 from Orange.widgets.tests.base import WidgetTest
 
-from orangecontrib.timeseries import Timeseries
-from orangecontrib.timeseries.widgets.owspiralogram import OWSpiralogram
+from orangecontrib.timeseries import Timeseries, fromtimestamp
+from orangecontrib.timeseries.widgets.owspiralogram import OWSpiralogram, \
+    Spiralogram
 from Orange.widgets.tests.utils import simulate
 from Orange.widgets.settings import Context
 
@@ -115,6 +118,45 @@ class TestOWSpiralogram(WidgetTest):
         self.assertEqual(w.agg_attr.name, 'Datetime')
         self.assertEqual(w.agg_func, 'Mean')
 
+    def test_cells(self):
+        """ Rows are grouped into cells by axes values """
+        def expected_cells(xdim, ydim, invert):
+            data = self.passengers
+            tz = data.time_variable.timezone
+            times = [fromtimestamp(t, tz=tz) for t in data.time_values]
+            (xvals, xfunc), (yvals, yfunc) = xdim.value, ydim.value
+            xvals = xvals or sorted(set(xfunc(i, t) for i, t in enumerate(times)))
+            yvals = yvals or sorted(set(yfunc(i, t) for i, t in enumerate(times)))
+            cells = defaultdict(list)
+            for i, t in enumerate(times):
+                cells[(xfunc(i, t), yfunc(i, t))].append(i)
+            if invert:
+                yvals = yvals[::-1]
+            return [[cells.get((xval, yval), []) for xval in xvals]
+                    for yval in yvals]
+
+        w = self.widget
+        self.send_signal(w.Inputs.time_series, self.passengers)
+        Axes = Spiralogram.AxesCategories
+        for ax1, ax2 in ((Axes.MONTHS_OF_YEAR, Axes.YEARS),
+                         (Axes.DAYS_OF_WEEK, Axes.MONTHS_OF_YEAR),
+                         (Axes.YEARS, Axes.MONTHS)):
+            for invert in (False, True):
+                w.ax1, w.ax2 = ax1.name.lower().replace('_', ' '), \
+                               ax2.name.lower().replace('_', ' ')
+                w.invert_date_order = invert
+                w.replot()
+                expected = expected_cells(ax1, ax2, invert)
+                cells = [[list(inds) for inds in row] for row in w.chart.indices]
+                self.assertEqual(cells, expected)
+
+                selection = [[0, 2], [], [1, len(expected[2]) - 1]]
+                self.assertEqual(
+                    w.chart.selection_indices(selection),
+                    sorted(chain.from_iterable(expected[i][j]
+                                               for i, row in enumerate(selection)
+                                               for j in row)))
+
 
 if __name__ == "__main__":
     unittest.main()